@@ -0,0 +1,42 @@
+"""
+Shared, memoized loader for the JSON manifests under manifests/.
+
+Raw file contents are cached by path and modification time, so a file
+rewritten on disk is re-read on the next call. orjson is used for parsing and
+serialization when installed, with the stdlib json module as fallback.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+from typing import Any, Dict
+
+try:
+    import orjson
+except ImportError:  # optional, faster (de)serialization
+    orjson = None
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(data: Any, sort_keys: bool = True) -> bytes:
+    """Serialize ``data`` as 2-space indented JSON with a trailing newline."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(data, option=option)
+    return (json.dumps(data, indent=2, sort_keys=sort_keys, ensure_ascii=False) + "\n").encode("utf-8")
+
+@functools.lru_cache(maxsize=32)
+def _read_cached(path: str, mtime: float) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
+
+def load(path: str) -> Dict:
+    # Callers mutate manifests in place, so parse a fresh object on every call
+    return loads(_read_cached(path, os.path.getmtime(path)))
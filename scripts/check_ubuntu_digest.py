@@ -3,61 +3,95 @@
 from __future__ import annotations
 
 import argparse
-import json
+import os
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
+
+import _manifest_cache
 
 ROOT = Path(__file__).resolve().parent.parent
 DIGEST_STATE = ROOT / "manifests" / "ubuntu_digests.json"
 
 def load_state() -> Dict[str, str]:
     if DIGEST_STATE.exists():
-        return json.loads(DIGEST_STATE.read_text(encoding="utf-8"))
+        return _manifest_cache.load(str(DIGEST_STATE))
     return {}
 
 def save_state(state: Dict[str, str]) -> None:
-    DIGEST_STATE.write_text(json.dumps(state, indent=2) + "\n", encoding="utf-8")
+    DIGEST_STATE.write_bytes(_manifest_cache.dumps(state, sort_keys=False))
+
+def _image_ref(os_name: str, tag: str) -> str:
+    """Return the image reference, routed through DOCKER_REGISTRY_MIRROR when set."""
+    mirror = os.environ.get("DOCKER_REGISTRY_MIRROR")
+    if mirror:
+        return f"{mirror.rstrip('/')}/library/{os_name}:{tag}"
+    return f"{os_name}:{tag}"
+
+# Go template evaluated by buildx, printing only the linux/amd64 digest
+AMD64_DIGEST_FORMAT = (
+    "{{range .Manifest.Manifests}}"
+    '{{if and (eq .Platform.Architecture "amd64") (eq .Platform.OS "linux")}}{{.Digest}}{{end}}'
+    "{{end}}"
+)
 
 def fetch_digest(tag: str) -> str:
     cmd = [
         "docker",
-        "manifest",
+        "buildx",
+        "imagetools",
         "inspect",
-        f"ubuntu:{tag}",
+        "--format",
+        AMD64_DIGEST_FORMAT,
+        _image_ref("ubuntu", tag),
     ]
-    output = subprocess.check_output(cmd, text=True)
-    data = json.loads(output)
-    # Find the amd64 linux manifest digest
-    for manifest in data.get("manifests", []):
-        platform = manifest.get("platform", {})
-        if platform.get("architecture") == "amd64" and platform.get("os") == "linux":
-            return manifest["digest"]
+    digest = subprocess.check_output(cmd, text=True).strip()
+    if digest:
+        return digest
     raise RuntimeError(f"Digest not found in manifest output for ubuntu:{tag}")
 
-def main(version: str, record: bool) -> int:
+def _try_fetch_digest(tag: str) -> Optional[str]:
+    try:
+        return fetch_digest(tag)
+    except (subprocess.CalledProcessError, RuntimeError) as exc:
+        print(f"Warning: Failed to fetch digest for ubuntu:{tag}: {exc}", file=sys.stderr)
+        return None
+
+def fetch_digests(tags: List[str]) -> Dict[str, str]:
+    """Fetch digests concurrently; tags that fail are warned about and omitted."""
+    with ThreadPoolExecutor(max_workers=max(len(tags), 1)) as executor:
+        digests = dict(zip(tags, executor.map(_try_fetch_digest, tags)))
+    return {tag: digest for tag, digest in digests.items() if digest is not None}
+
+def main(versions: List[str], record: bool) -> int:
     state = load_state()
-    current_digest = fetch_digest(version)
-    previous_digest = state.get(version)
+    changed = False
 
-    if previous_digest != current_digest:
-        print(f"Digest update detected for ubuntu:{version}")
-        print(f"Old: {previous_digest}")
-        print(f"New: {current_digest}")
-        if record:
+    for version, current_digest in fetch_digests(versions).items():
+        previous_digest = state.get(version)
+        if previous_digest != current_digest:
+            print(f"Digest update detected for ubuntu:{version}")
+            print(f"Old: {previous_digest}")
+            print(f"New: {current_digest}")
             state[version] = current_digest
+            changed = True
+        else:
+            print(f"No digest change for ubuntu:{version}")
+
+    if changed:
+        if record:
             save_state(state)
         return 1
-
-    print(f"No digest change for ubuntu:{version}")
     return 0
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Check Ubuntu base image digest updates")
-    parser.add_argument("version", help="Ubuntu tag (e.g., 24.04)")
+    parser.add_argument("versions", nargs="+", metavar="version", help="Ubuntu tag(s) (e.g., 24.04)")
     parser.add_argument("--record", action="store_true", help="Record the current digest")
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
-    raise SystemExit(main(args.version, args.record))
+    raise SystemExit(main(args.versions, args.record))
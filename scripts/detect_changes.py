@@ -9,74 +9,151 @@ import subprocess
 import sys
 from pathlib import Path
 
+import _manifest_cache
+
+# Repository root; git pathspecs are relative to the working directory, so run git from here
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+SIGNIFICANT_PACKAGES = frozenset({
+    "docker-ce",
+    "docker",
+    "podman",
+    "containerd.io",
+    "containerd",
+    "docker-compose-plugin",
+    "docker-cli-compose",
+})
+
 def load_json(filepath):
-    with open(filepath) as f:
-        return json.load(f)
+    return _manifest_cache.load(str(filepath))
+
+def load_json_from_git(*filepaths):
+    """Load JSON files from the last committed version (HEAD).
+
+    All files are read through a single ``git cat-file --batch`` process.
+    Returns one parsed document per path, or None if it is missing or invalid.
+    """
+    try:
+        proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=BASE_DIR,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError:
+        return [None] * len(filepaths)
+
+    objects = "".join(f"HEAD:{filepath}\n" for filepath in filepaths)
+    try:
+        proc.stdin.write(objects.encode())
+        proc.stdin.close()
+    except BrokenPipeError:
+        # git exited early, e.g. outside a work tree
+        proc.stdout.close()
+        proc.wait()
+        return [None] * len(filepaths)
+
+    results = []
+    for _ in filepaths:
+        header = proc.stdout.readline().split()
+        # "<sha> <type> <size>" is followed by the object body; "<object> missing" is not
+        if len(header) != 3:
+            results.append(None)
+            continue
+        # Always consume the body (and trailing newline) to stay in sync with the stream
+        content = proc.stdout.read(int(header[2]) + 1)[:-1]
+        if header[1] != b"blob":
+            results.append(None)
+            continue
+        try:
+            results.append(_manifest_cache.loads(content))
+        except json.JSONDecodeError:
+            results.append(None)
+    proc.stdout.close()
+    proc.wait()
+    return results
+
+def flatten_packages(tree, significant):
+    """Flatten {os: {version: {section: {package: version}}}} into
+    {(os, version, section, package): version}, keeping significant packages only."""
+    flat = {}
+    if not isinstance(tree, dict):
+        return flat
+    for os_name, os_versions in tree.items():
+        if not isinstance(os_versions, dict):
+            continue
+        for os_version, sections in os_versions.items():
+            if not isinstance(sections, dict):
+                continue
+            for section, packages in sections.items():
+                if not isinstance(packages, dict):
+                    continue
+                for package, version in packages.items():
+                    if package in significant:
+                        flat[(os_name, os_version, section, package)] = version
+    return flat
 
-def load_json_from_git(filepath):
-    """Load JSON file content from the last committed version (HEAD)."""
+def flatten_alias_patches(targets):
+    """Flatten targets.json into {(os, version): alias_patch}."""
+    flat = {}
+    if not isinstance(targets, dict):
+        return flat
+    for os_name, os_versions in targets.get("targets", {}).items():
+        for version_key, metadata in os_versions.items():
+            flat[(os_name, version_key)] = metadata.get("alias_patch", "")
+    return flat
+
+def get_changed_files(filepaths):
+    """Return the subset of filepaths that differ from HEAD, or None if git fails."""
     try:
         result = subprocess.run(
-            ["git", "show", f"HEAD:{filepath}"],
+            ["git", "diff", "--name-only", "HEAD", "--", *filepaths],
+            cwd=BASE_DIR,
             capture_output=True,
             text=True,
             check=True,
         )
-        return json.loads(result.stdout)
-    except (subprocess.CalledProcessError, json.JSONDecodeError):
+    except (OSError, subprocess.CalledProcessError):
         return None
-
-def get_significant_packages():
-    return [
-        "docker-ce",
-        "docker",
-        "podman",
-        "containerd.io",
-        "containerd",
-        "docker-compose-plugin",
-        "docker-cli-compose",
-    ]
+    return set(result.stdout.split())
 
 def check_for_changes():
-    base_dir = Path(__file__).parent.parent
+    versions_path = "manifests/package_versions.json"
+    targets_path = "manifests/targets.json"
     
-    # Load current (working tree) versions
-    versions_file = base_dir / "manifests/package_versions.json"
-    current_versions = load_json(versions_file)
+    # Cheap check first: nothing to diff if neither manifest changed
+    changed_files = get_changed_files([versions_path, targets_path])
+    if changed_files is None:
+        changed_files = {versions_path, targets_path}
+    if not changed_files:
+        return []
     
-    targets_file = base_dir / "manifests/targets.json"
-    current_targets = load_json(targets_file)
+    # Load current (working tree) and previous (HEAD) versions of changed files only
+    changed_paths = [path for path in (versions_path, targets_path) if path in changed_files]
+    current = {path: load_json(BASE_DIR / path) for path in changed_paths}
+    previous = dict(zip(changed_paths, load_json_from_git(*changed_paths)))
     
-    # Load previous (HEAD) versions for comparison
-    prev_versions = load_json_from_git("manifests/package_versions.json")
-    prev_targets = load_json_from_git("manifests/targets.json")
-    
-    significant_packages = get_significant_packages()
     changes = []
     
-    # Check docker-compose version change
-    current_compose = current_targets.get("docker_compose_version", "")
-    prev_compose = prev_targets.get("docker_compose_version", "") if prev_targets else ""
-    if current_compose and current_compose != prev_compose:
-        changes.append({
-            "type": "docker-compose",
-            "old_version": prev_compose,
-            "new_version": current_compose
-        })
-    
-    # Check alias_patch changes (base OS version updates like alpine 3.19.8 -> 3.19.9)
-    for os_name, os_versions in current_targets.get("targets", {}).items():
-        for version_key, metadata in os_versions.items():
-            current_patch = metadata.get("alias_patch", "")
-            prev_patch = ""
-            if prev_targets:
-                prev_patch = (
-                    prev_targets
-                    .get("targets", {})
-                    .get(os_name, {})
-                    .get(version_key, {})
-                    .get("alias_patch", "")
-                )
+    if targets_path in current:
+        current_targets = current[targets_path]
+        prev_targets = previous[targets_path]
+        
+        # Check docker-compose version change
+        current_compose = current_targets.get("docker_compose_version", "")
+        prev_compose = prev_targets.get("docker_compose_version", "") if prev_targets else ""
+        if current_compose and current_compose != prev_compose:
+            changes.append({
+                "type": "docker-compose",
+                "old_version": prev_compose,
+                "new_version": current_compose
+            })
+        
+        # Check alias_patch changes (base OS version updates like alpine 3.19.8 -> 3.19.9)
+        prev_patches = flatten_alias_patches(prev_targets)
+        for (os_name, version_key), current_patch in flatten_alias_patches(current_targets).items():
+            prev_patch = prev_patches.get((os_name, version_key), "")
             if current_patch and current_patch != prev_patch:
                 changes.append({
                     "type": "alias_patch",
@@ -86,40 +163,23 @@ def check_for_changes():
                     "new_version": current_patch
                 })
     
-    # Check package version changes
-    for os_name, os_versions in current_versions.items():
-        if os_name == "docker_compose_version":
-            continue
-            
-        for os_version, sections in os_versions.items():
-            for section, packages in sections.items():
-                if not isinstance(packages, dict):
-                    continue
-                    
-                for package, version in packages.items():
-                    if package in significant_packages:
-                        # Get previous version for comparison
-                        prev_version = None
-                        if prev_versions:
-                            prev_version = (
-                                prev_versions
-                                .get(os_name, {})
-                                .get(os_version, {})
-                                .get(section, {})
-                                .get(package)
-                            )
-                        
-                        # Only report if version actually changed
-                        if version != prev_version:
-                            changes.append({
-                                "type": "package",
-                                "os": os_name,
-                                "os_version": os_version,
-                                "section": section,
-                                "package": package,
-                                "old_version": prev_version,
-                                "new_version": version
-                            })
+    if versions_path in current:
+        # Check package version changes
+        prev_flat = flatten_packages(previous[versions_path], SIGNIFICANT_PACKAGES)
+        for key, version in flatten_packages(current[versions_path], SIGNIFICANT_PACKAGES).items():
+            prev_version = prev_flat.get(key)
+            # Only report if version actually changed
+            if version != prev_version:
+                os_name, os_version, section, package = key
+                changes.append({
+                    "type": "package",
+                    "os": os_name,
+                    "os_version": os_version,
+                    "section": section,
+                    "package": package,
+                    "old_version": prev_version,
+                    "new_version": version
+                })
     
     return changes
 
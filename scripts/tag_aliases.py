@@ -3,24 +3,26 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict
 
+import _manifest_cache
+
 ROOT = Path(__file__).resolve().parent.parent
 MANIFEST_PATH = ROOT / "manifests" / "targets.json"
 
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 30
-DELAY_BETWEEN_OPERATIONS = 2
+# Retags in flight at once; rate-limit backoff is handled per retag
+TAG_CONCURRENCY = int(os.environ.get("TAG_CONCURRENCY", "4"))
 
 def load_manifest(path: Path) -> Dict:
-    with path.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    return _manifest_cache.load(str(path))
 
 def docker_login() -> None:
     """Log in to Docker Hub using environment credentials if available."""
@@ -87,7 +89,7 @@ def main(argv: list[str]) -> int:
 
     manifest = load_manifest(MANIFEST_PATH)
 
-    first_operation = True
+    retags: list[tuple[str, str]] = []
     for alias, cfg in manifest.get("channels", {}).items():
         os_name = cfg.get("os")
         version = cfg.get("version")
@@ -98,14 +100,16 @@ def main(argv: list[str]) -> int:
             print(f"Skipping alias {alias}: version {version} not found")
             continue
 
-        # Add delay between operations to avoid rate limiting
-        if not first_operation and not args.dry_run:
-            time.sleep(DELAY_BETWEEN_OPERATIONS)
-        first_operation = False
-
         alias_patch = os_versions[version]["alias_patch"]
         source_tag = f"{manifest['version']}-{os_name}-{alias_patch}-{engine}"
-        retag(source_tag, alias, args.repo, dry_run=args.dry_run)
+        retags.append((source_tag, alias))
+
+    with ThreadPoolExecutor(max_workers=max(TAG_CONCURRENCY, 1)) as executor:
+        # Consume results so a failed retag propagates its exception
+        list(executor.map(
+            lambda pair: retag(pair[0], pair[1], args.repo, dry_run=args.dry_run),
+            retags,
+        ))
 
     return 0
 
@@ -5,23 +5,55 @@ Update Docker Hub repository overview from README.md
 Usage:
     export DOCKERHUB_USERNAME="your-username"
     export DOCKERHUB_TOKEN="your-token"
-    python3 update_dockerhub_overview.py [README_PATH]
+    python3 update_dockerhub_overview.py [--verify] [--force] [README_PATH]
+
+Pass --verify to check repository access and edit permissions before updating.
+The update is skipped when the README matches the last pushed copy (tracked in
+manifests/.dockerhub_readme_hash); pass --force to push regardless.
 
 Get your Docker Hub token from: https://hub.docker.com/settings/security
 """
 
+import argparse
 import os
 import sys
 import json
+import hashlib
 import requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Hash of the README last pushed successfully, to skip no-op updates
+README_HASH_PATH = Path(__file__).resolve().parent.parent / "manifests" / ".dockerhub_readme_hash"
+
+
+def create_session():
+    """Return a keep-alive session with retry/backoff for Docker Hub."""
+    session = requests.Session()
+    # Docker Hub blocks default python-requests User-Agent with 500 error
+    session.headers["User-Agent"] = "container-os/1.0"
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    session.mount("https://hub.docker.com", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry))
+    return session
 
 
 def main():
     # Configuration
     repo_namespace = "miget"
     repo_name = "container-os"
-    readme_path = sys.argv[1] if len(sys.argv) > 1 else "README.md"
+    parser = argparse.ArgumentParser(description="Update Docker Hub repository overview from README.md")
+    parser.add_argument("--verify", action="store_true", help="Verify repository access before updating")
+    parser.add_argument("--force", action="store_true", help="Update even if the README is unchanged since the last push")
+    parser.add_argument("readme", nargs="?", default="README.md", help="Path to the README")
+    args = parser.parse_args()
+    readme_path = args.readme
     
     # Check environment variables
     username = os.environ.get("DOCKERHUB_USERNAME")
@@ -43,7 +75,16 @@ def main():
         sys.exit(1)
     
     print(f"Reading README from: {readme_path}")
-    readme_content = readme_file.read_text()
+    readme_bytes = readme_file.read_bytes()
+    readme_digest = hashlib.blake2b(readme_bytes, digest_size=16).hexdigest()
+    previous_digest = README_HASH_PATH.read_text().strip() if README_HASH_PATH.exists() else ""
+    if readme_digest == previous_digest and not args.force:
+        print("README unchanged since last update, skipping")
+        return
+    readme_content = readme_bytes.decode("utf-8")
+    
+    # One session so auth, verify and update share a connection
+    session = create_session()
     
     # Authenticate
     print("Authenticating with Docker Hub...")
@@ -54,9 +95,7 @@ def main():
     }
     
     try:
-        # Docker Hub blocks default python-requests User-Agent with 500 error
-        auth_headers = {"User-Agent": "container-os/1.0"}
-        auth_response = requests.post(auth_url, json=auth_data, headers=auth_headers)
+        auth_response = session.post(auth_url, json=auth_data)
         auth_response.raise_for_status()
         jwt_token = auth_response.json().get("token")
         
@@ -69,35 +108,37 @@ def main():
         print(f"Error: Authentication failed - {e}")
         sys.exit(1)
     
-    # First, verify we can access the repository
-    print(f"Verifying access to {repo_namespace}/{repo_name}...")
-    verify_url = f"https://hub.docker.com/v2/repositories/{repo_namespace}/{repo_name}/"
     headers = {
         "Authorization": f"JWT {jwt_token}",
         "Content-Type": "application/json"
     }
     
-    try:
-        verify_response = requests.get(verify_url, headers=headers)
-        verify_response.raise_for_status()
-        repo_info = verify_response.json()
-        print(f"✓ Repository found: {repo_info.get('name', 'unknown')}")
+    # Optionally verify we can access the repository; failures also surface on update
+    if args.verify:
+        print(f"Verifying access to {repo_namespace}/{repo_name}...")
+        verify_url = f"https://hub.docker.com/v2/repositories/{repo_namespace}/{repo_name}/"
         
-        # Check if user has write permissions
-        if repo_info.get('can_edit', False):
-            print("✓ User has edit permissions")
-        else:
-            print("⚠ Warning: User may not have edit permissions")
-            print(f"  Authenticated as: {username}")
-            print(f"  Repository namespace: {repo_namespace}")
-            if username != repo_namespace:
-                print(f"  Note: Username '{username}' differs from namespace '{repo_namespace}'")
-                print(f"  You may need organization permissions or to use a token with write access")
-    except requests.exceptions.RequestException as e:
-        print(f"Error: Cannot access repository - {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response: {e.response.text}")
-        sys.exit(1)
+        try:
+            verify_response = session.get(verify_url, headers=headers)
+            verify_response.raise_for_status()
+            repo_info = verify_response.json()
+            print(f"✓ Repository found: {repo_info.get('name', 'unknown')}")
+        
+            # Check if user has write permissions
+            if repo_info.get('can_edit', False):
+                print("✓ User has edit permissions")
+            else:
+                print("⚠ Warning: User may not have edit permissions")
+                print(f"  Authenticated as: {username}")
+                print(f"  Repository namespace: {repo_namespace}")
+                if username != repo_namespace:
+                    print(f"  Note: Username '{username}' differs from namespace '{repo_namespace}'")
+                    print(f"  You may need organization permissions or to use a token with write access")
+        except requests.exceptions.RequestException as e:
+            print(f"Error: Cannot access repository - {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                print(f"Response: {e.response.text}")
+            sys.exit(1)
     
     # Update repository description
     print(f"Updating Docker Hub overview for {repo_namespace}/{repo_name}...")
@@ -107,12 +148,13 @@ def main():
     }
     
     try:
-        update_response = requests.patch(update_url, headers=headers, json=update_data)
+        update_response = session.patch(update_url, headers=headers, json=update_data)
         update_response.raise_for_status()
         
         response_data = update_response.json()
         if "full_description" in response_data:
             print("✓ Successfully updated Docker Hub overview")
+            README_HASH_PATH.write_text(readme_digest + "\n")
             print(f"View at: https://hub.docker.com/r/{repo_namespace}/{repo_name}")
         else:
             print("Warning: Update may have succeeded but response format unexpected")
@@ -3,22 +3,42 @@
 from __future__ import annotations
 
 import argparse
-import json
+import fcntl
+import functools
+import hashlib
+import os
 import re
 import subprocess
 import sys
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urljoin
 
 import requests
-from packaging.version import Version
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import _manifest_cache
 
 ROOT = Path(__file__).resolve().parent.parent
 MANIFEST_PATH = ROOT / "manifests" / "targets.json"
 PACKAGE_VERSIONS_PATH = ROOT / "manifests" / "package_versions.json"
+VERSION_CACHE_PATH = ROOT / ".cache" / "version_lookup.json"
+VERSION_CACHE_TTL_SECONDS = 3600
+# Validators only cost a conditional request to reuse, so keep them longer
+ETAG_CACHE_TTL_SECONDS = 7 * 24 * 3600
+UBUNTU_DIGESTS_PATH = ROOT / "manifests" / "ubuntu_digests.json"
+QUERY_IMAGE_PREFIX = "container-os-pkgver"
+REGISTRY_URL = "https://registry-1.docker.io"
+REGISTRY_AUTH_URL = "https://auth.docker.io/token"
+# Targets processed at once, and Docker Hub requests in flight (429 avoidance)
+UPDATE_CONCURRENCY = int(os.environ.get("UPDATE_CONCURRENCY", "4"))
+REGISTRY_CONCURRENCY = 4
 
 DOCKER_HUB_REPOS = {
     "alpine": "library/alpine",
@@ -44,6 +64,21 @@ DOCKER_APT_SETUP = (
 )
 
 VERSION_PATTERN = re.compile(r"^(?:\d+)(?:\.\d+)*$")
+FULL_PATCH_PATTERN = re.compile(r"^\d+\.\d+\.\d+$")
+APK_PACKAGE_PATTERN = re.compile(r"^(?P<name>.+?)-(?P<version>\d[^-]*-r\d+)$", re.M)
+# Stanza header "name:" (or "name:arch:") followed by indented fields up to "Candidate:"
+APT_CANDIDATE_PATTERN = re.compile(
+    r"^(?P<name>[^\s:]+)(?::[^\s:]+)?:\n(?:[ \t].*\n)*?[ \t]+Candidate:[ \t]*(?P<version>\S+)",
+    re.M,
+)
+
+_thread_local = threading.local()
+_tag_list_lock = threading.Lock()
+_registry_semaphore = threading.BoundedSemaphore(REGISTRY_CONCURRENCY)
+
+# Tag and package lookups persisted between runs: {key: {"value", "fetched_at"[, "ttl"]}}
+_version_cache: Dict[str, Dict] = {}
+_version_cache_lock = threading.Lock()
 
 @dataclass
 class UpdateResult:
@@ -57,46 +92,300 @@ class UpdateError(Exception):
 def load_json(path: Path) -> Dict:
     if not path.exists():
         raise UpdateError(f"Required file missing: {path}")
-    with path.open("r", encoding="utf-8") as fh:
-        return json.load(fh)
+    return _manifest_cache.load(str(path))
 
 def save_json(path: Path, data: Dict) -> None:
-    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    """Write ``data`` to ``path`` unless the file already has identical content."""
+    content = _manifest_cache.dumps(data)
+    if path.exists() and path.read_bytes() == content:
+        return
+    path.write_bytes(content)
+
+def _is_fresh(entry: Optional[Dict]) -> bool:
+    return bool(entry) and time.time() - entry.get("fetched_at", 0) < entry.get("ttl", VERSION_CACHE_TTL_SECONDS)
 
+def load_version_cache(path: Path = VERSION_CACHE_PATH) -> None:
+    """Populate the lookup cache from disk, ignoring a missing or corrupt file."""
+    try:
+        with path.open("rb") as fh:
+            fcntl.flock(fh, fcntl.LOCK_SH)
+            data = _manifest_cache.loads(fh.read())
+    except (OSError, ValueError):
+        return
+    if isinstance(data, dict):
+        with _version_cache_lock:
+            _version_cache.update({key: entry for key, entry in data.items() if _is_fresh(entry)})
+
+def save_version_cache(path: Path = VERSION_CACHE_PATH) -> None:
+    """Merge fresh entries into the on-disk cache under an exclusive lock."""
+    with _version_cache_lock:
+        entries = dict(_version_cache)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a+b") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            fh.seek(0)
+            try:
+                data = _manifest_cache.loads(fh.read())
+            except ValueError:
+                data = {}
+            # Concurrent runs may have written newer entries meanwhile
+            for key, entry in entries.items():
+                if key not in data or data[key].get("fetched_at", 0) < entry["fetched_at"]:
+                    data[key] = entry
+            data = {key: entry for key, entry in data.items() if _is_fresh(entry)}
+            fh.seek(0)
+            fh.truncate()
+            fh.write(_manifest_cache.dumps(data))
+    except OSError as exc:
+        print(f"Warning: Failed to write version cache {path}: {exc}", file=sys.stderr)
+
+def cache_get(key: str) -> Any:
+    """Return the cached value for ``key`` if it is within the TTL, else None."""
+    with _version_cache_lock:
+        entry = _version_cache.get(key)
+    return entry["value"] if _is_fresh(entry) else None
+
+def cache_put(key: str, value: Any, ttl: Optional[int] = None) -> None:
+    entry = {"value": value, "fetched_at": time.time()}
+    if ttl is not None:
+        entry["ttl"] = ttl
+    with _version_cache_lock:
+        _version_cache[key] = entry
+
+def ttl_cache(key_fn: Callable[..., str]) -> Callable:
+    """Cache a function's result in the persistent lookup cache under ``key_fn(*args)``."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = key_fn(*args)
+            cached = cache_get(key)
+            if cached is not None:
+                return cached
+            value = func(*args)
+            cache_put(key, value)
+            return value
+        return wrapper
+    return decorator
+
+def _package_cache_key(os_name: str, version: str, package: str) -> str:
+    return f"pkg:{os_name}:{version}:{package}"
+
+def get_session() -> requests.Session:
+    """Return a per-thread HTTP session so connections are reused across pages."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        # Docker Hub rejects some requests carrying the default python-requests User-Agent
+        session.headers["User-Agent"] = "container-os/1.0"
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+        _thread_local.session = session
+    return session
+
+@functools.lru_cache(maxsize=None)
 def fetch_latest_tag(os_name: str, prefix: str) -> str:
     repo = DOCKER_HUB_REPOS.get(os_name)
-    if not repo:
+    # A fully pinned patch version cannot be improved upon
+    if not repo or FULL_PATCH_PATTERN.match(prefix):
         return prefix
-
-    url = f"https://hub.docker.com/v2/repositories/{repo}/tags"
-    params = {"page_size": 100, "name": prefix}
-    candidates: List[str] = []
-
+    return _query_latest_tag(repo, prefix)
+
+def _registry_get(url: str, **kwargs) -> requests.Response:
+    with _registry_semaphore:
+        response = get_session().get(url, timeout=30, **kwargs)
+    response.raise_for_status()
+    return response
+
+def _registry_token(repo: str) -> str:
+    """Fetch an anonymous pull token for ``repo`` from Docker Hub's auth service."""
+    response = _registry_get(
+        REGISTRY_AUTH_URL,
+        params={"service": "registry.docker.io", "scope": f"repository:{repo}:pull"},
+    )
+    return response.json()["token"]
+
+@functools.lru_cache(maxsize=None)
+def _list_tags(repo: str) -> Tuple[str, ...]:
+    """Return every tag of ``repo`` from the registry v2 tags/list endpoint.
+
+    A single-page listing is stored with its ETag and revalidated with
+    ``If-None-Match`` on later runs, so an unchanged list costs a bodiless 304.
+    """
+    headers = {"Authorization": f"Bearer {_registry_token(repo)}"}
+    url: Optional[str] = f"{REGISTRY_URL}/v2/{repo}/tags/list"
+    etag_key = f"etag:{url}"
+    validated = cache_get(etag_key)
+    if validated:
+        headers["If-None-Match"] = validated["etag"]
+    params: Optional[Dict] = {"n": 10000}
+    tags: List[str] = []
+    # The full list normally arrives in one response; follow Link if the registry pages
     while url:
-        response = requests.get(url, params=params if url.endswith("/tags") else None, timeout=30)
-        response.raise_for_status()
-        payload = response.json()
-        for result in payload.get("results", []):
-            tag_name = result.get("name", "")
-            if not tag_name.startswith(prefix):
-                continue
-            if not VERSION_PATTERN.match(tag_name):
-                continue
-            candidates.append(tag_name)
-        url = payload.get("next")
+        response = _registry_get(url, params=params, headers=headers)
+        if response.status_code == 304:
+            cache_put(etag_key, validated, ETAG_CACHE_TTL_SECONDS)
+            return tuple(validated["tags"])
+        headers.pop("If-None-Match", None)
+        tags.extend(response.json().get("tags") or [])
+        next_url = response.links.get("next", {}).get("url")
+        if params is not None and not next_url and response.headers.get("ETag"):
+            cache_put(etag_key, {"etag": response.headers["ETag"], "tags": tags}, ETAG_CACHE_TTL_SECONDS)
+        url = urljoin(REGISTRY_URL, next_url) if next_url else None
         params = None
+    return tuple(tags)
+
+def _version_key(tag: str) -> Tuple[int, ...]:
+    # VERSION_PATTERN guarantees dotted integers, so tuples compare like versions
+    return tuple(int(part) for part in tag.split("."))
+
+@ttl_cache(lambda repo, prefix: f"tag:{repo}:{prefix}")
+def _query_latest_tag(repo: str, prefix: str) -> str:
+    # Targets sharing a repo run concurrently; list its tags only once
+    with _tag_list_lock:
+        tags = _list_tags(repo)
 
+    candidates = [tag for tag in tags if tag.startswith(prefix) and VERSION_PATTERN.match(tag)]
     if not candidates:
         return prefix
-
+    return max(candidates, key=_version_key)
+
+def _image_ref(os_name: str, tag: str) -> str:
+    """Return the image reference, routed through DOCKER_REGISTRY_MIRROR when set."""
+    mirror = os.environ.get("DOCKER_REGISTRY_MIRROR")
+    if mirror:
+        return f"{mirror.rstrip('/')}/library/{os_name}:{tag}"
+    return f"{os_name}:{tag}"
+
+def _prepare_query_image(version: str, needs_docker_repo: bool) -> str:
+    """Build (or reuse) an Ubuntu image with the apt index already downloaded.
+
+    The tag is keyed on the recorded base digest, the apt setup and the UTC
+    date, so the baked index is refreshed at least daily.
+    """
+    setup = "apt-get update >/dev/null 2>&1"
+    if needs_docker_repo:
+        setup += f" && {DOCKER_APT_SETUP}"
     try:
-        return str(max((Version(tag) for tag in candidates)))
-    except Exception as exc:
-        raise UpdateError(f"Failed to determine latest tag for {os_name}:{prefix}: {exc}") from exc
-
-def run_container(os_name: str, version: str, command: str) -> str:
-    image = f"{os_name}:{version}"
-    exec_cmd = ["docker", "run", "--rm", image, "/bin/sh", "-c", command]
+        base_digest = _manifest_cache.load(str(UBUNTU_DIGESTS_PATH)).get(version, "")
+    except (OSError, ValueError):
+        base_digest = ""
+    base = _image_ref("ubuntu", version)
+    key = hashlib.sha256(
+        "\n".join([base, base_digest, setup, time.strftime("%Y-%m-%d", time.gmtime())]).encode()
+    ).hexdigest()[:12]
+    repository = f"{QUERY_IMAGE_PREFIX}-ubuntu-{version}"
+    image = f"{repository}:{key}"
+
+    inspect = subprocess.run(["docker", "image", "inspect", image], capture_output=True, check=False)
+    if inspect.returncode == 0:
+        return image
+
+    dockerfile = f"FROM {base}\nRUN {setup}\n"
+    completed = subprocess.run(
+        ["docker", "build", "--pull", "-t", image, "-"],
+        input=dockerfile,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise UpdateError(f"Failed to build query image for ubuntu:{version}: {completed.stderr.strip()}")
+    _remove_stale_query_images(repository, image)
+    return image
+
+def _remove_stale_query_images(repository: str, keep: str) -> None:
+    """Remove superseded tags of a query image repository, best effort."""
+    listing = subprocess.run(
+        ["docker", "images", "--format", "{{.Repository}}:{{.Tag}}", repository],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    stale = [ref for ref in listing.stdout.split() if ref != keep]
+    # No -f: images still used by a concurrent run's containers are left alone
+    if stale:
+        subprocess.run(["docker", "rmi", *stale], capture_output=True, check=False)
+
+@functools.lru_cache(maxsize=None)
+def query_image(os_name: str, version: str, needs_docker_repo: bool = False) -> str:
+    """Return the image package queries for ``os_name:version`` run in."""
+    if os_name == "ubuntu":
+        return _prepare_query_image(version, needs_docker_repo)
+    return _image_ref(os_name, version)
+
+class KeptAliveContainers:
+    """One long-lived container per image, queried via ``docker exec``.
+
+    Use as a context manager; every started container is removed on exit.
+    """
+
+    def __init__(self) -> None:
+        self._names: Dict[str, str] = {}
+        # Images whose container already ran its package index refresh
+        self._refreshed: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "KeptAliveContainers":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        with self._lock:
+            names = list(self._names.values())
+            self._names.clear()
+        if names:
+            subprocess.run(["docker", "rm", "-f", *names], capture_output=True, check=False)
+
+    def start(self, image: str) -> str:
+        """Pull ``image`` and start a detached container to ``docker exec`` into."""
+        if not image.startswith(QUERY_IMAGE_PREFIX):
+            subprocess.run(["docker", "pull", "--quiet", image], capture_output=True, check=False)
+        name = f"pkgver-{image.replace(':', '-').replace('/', '-')}-{os.getpid()}"
+        completed = subprocess.run(
+            ["docker", "run", "-d", "--rm", "--name", name, image, "sleep", "86400"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise UpdateError(f"Failed to start container for {image}: {completed.stderr.strip()}")
+        with self._lock:
+            self._names[image] = name
+        return name
+
+    def claim_refresh(self, image: str) -> bool:
+        """Return True exactly once per image, for the caller that should refresh its index."""
+        with self._lock:
+            if image in self._refreshed:
+                return False
+            self._refreshed.add(image)
+            return True
+
+    def name_for(self, image: str) -> str:
+        """Return the container for ``image``, starting one if needed."""
+        with self._lock:
+            name = self._names.get(image)
+        return name if name is not None else self.start(image)
+
+def start_containers(containers: KeptAliveContainers, images: List[Tuple[str, str, bool]]) -> None:
+    """Prepare and start one container per (os, version, needs_docker_repo) concurrently."""
+    def _start(spec: Tuple[str, str, bool]) -> None:
+        try:
+            containers.start(query_image(*spec))
+        except UpdateError as exc:
+            print(f"Warning: {exc}", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=max(len(images), 1)) as executor:
+        list(executor.map(_start, images))
+
+def run_container(containers: KeptAliveContainers, image: str, argv: List[str]) -> str:
+    # Exec the binary directly; no shell is needed inside the container
+    exec_cmd = ["docker", "exec", containers.name_for(image), *argv]
     completed = subprocess.run(exec_cmd, capture_output=True, text=True, check=False)
     if completed.returncode != 0:
         raise UpdateError(
@@ -104,107 +393,151 @@ def run_container(os_name: str, version: str, command: str) -> str:
         )
     return completed.stdout.strip()
 
-def fetch_all_package_versions(os_name: str, version: str, packages: List[str]) -> Dict[str, Optional[str]]:
-    """Fetch versions for all packages in a single container run."""
+def parse_apt_policy(output: str) -> Dict[str, Optional[str]]:
+    """Parse multi-package ``apt-cache policy`` output into {package: candidate}."""
+    results: Dict[str, Optional[str]] = {}
+    for match in APT_CANDIDATE_PATTERN.finditer(output):
+        version = match.group("version")
+        # Filter out "(none)" versions
+        results[match.group("name")] = version if version != "(none)" else None
+    return results
+
+def parse_apk_search(output: str) -> Dict[str, Optional[str]]:
+    """Parse ``apk search -e`` output lines (``name-version-rN``) into {package: version}."""
+    return {match.group("name"): match.group("version") for match in APK_PACKAGE_PATTERN.finditer(output)}
+
+# Per-OS (index refresh argv run once per container, query argv prefix, output parser);
+# package names are appended to the query argv
+OS_PACKAGE_COMMANDS: Dict[str, Tuple[Optional[List[str]], List[str], Callable[[str], Dict[str, Optional[str]]]]] = {
+    # The apt index (and Docker's repo, if needed) is baked into the query image
+    "ubuntu": (None, ["apt-cache", "policy"], parse_apt_policy),
+    "alpine": (["apk", "update"], ["apk", "search", "-e"], parse_apk_search),
+}
+
+def _needs_docker_repo(os_name: str, packages: Iterable[str]) -> bool:
+    """Check if any packages need Docker apt repo (Ubuntu only)."""
+    return os_name == "ubuntu" and any(p in DOCKER_APT_PACKAGES for p in packages)
+
+def fetch_all_package_versions(
+    containers: KeptAliveContainers, os_name: str, version: str, packages: List[str]
+) -> Dict[str, Optional[str]]:
+    """Fetch versions for all packages in a single container run.
+
+    Versions found in the lookup cache are reused; only the rest are queried.
+    """
     if not packages:
         return {}
 
-    # Check if any packages need Docker apt repo (Ubuntu only)
-    needs_docker_repo = os_name == "ubuntu" and any(p in DOCKER_APT_PACKAGES for p in packages)
+    cached = {pkg: cache_get(_package_cache_key(os_name, version, pkg)) for pkg in packages}
+    missing = [pkg for pkg, value in cached.items() if value is None]
+    if not missing:
+        return cached
 
-    # Build a script that queries all packages and outputs JSON
-    if os_name == "ubuntu":
-        setup = "apt-get update >/dev/null 2>&1"
-        if needs_docker_repo:
-            setup += f" && {DOCKER_APT_SETUP}"
-
-        # Build query commands for each package
-        queries = []
-        for pkg in packages:
-            # Output format: PACKAGE_NAME=VERSION
-            queries.append(
-                f'echo "{pkg}=$(apt-cache policy {pkg} 2>/dev/null | awk \'/Candidate:/{{print $2}}\')"'
-            )
-        script = f"{setup} && " + " && ".join(queries)
-
-    elif os_name == "alpine":
-        setup = "apk update >/dev/null 2>&1"
-        queries = []
-        for pkg in packages:
-            # Output format: PACKAGE_NAME=VERSION (extract version from apk search output)
-            queries.append(
-                f'echo "{pkg}=$(apk search -e {pkg} 2>/dev/null | sed -n "s/^{pkg}-//p")"'
-            )
-        script = f"{setup} && " + " && ".join(queries)
-
-    else:
+    if os_name not in OS_PACKAGE_COMMANDS:
         return {pkg: None for pkg in packages}
+    refresh, command, parse = OS_PACKAGE_COMMANDS[os_name]
+    needs_docker_repo = _needs_docker_repo(os_name, packages)
 
     try:
-        output = run_container(os_name, version, script)
+        image = query_image(os_name, version, needs_docker_repo)
+        if refresh and containers.claim_refresh(image):
+            run_container(containers, image, refresh)
+        # Query all packages with a single invocation of the package manager
+        output = run_container(containers, image, [*command, *missing])
     except UpdateError as e:
         print(f"Warning: Failed to fetch packages for {os_name}:{version}: {e}", file=sys.stderr)
         return {pkg: None for pkg in packages}
 
-    # Parse output
-    results: Dict[str, Optional[str]] = {}
-    for line in output.splitlines():
-        if "=" in line:
-            pkg_name, pkg_version = line.split("=", 1)
-            pkg_version = pkg_version.strip()
-            # Filter out empty or "(none)" versions
-            if pkg_version and pkg_version != "(none)":
-                results[pkg_name] = pkg_version
-            else:
-                results[pkg_name] = None
-
+    parsed = parse(output)
+    for pkg in missing:
+        if parsed.get(pkg):
+            cache_put(_package_cache_key(os_name, version, pkg), parsed[pkg])
     # Ensure all requested packages have an entry
-    for pkg in packages:
-        if pkg not in results:
-            results[pkg] = None
+    return {pkg: cached[pkg] or parsed.get(pkg) for pkg in packages}
 
-    return results
+def _process_image(
+    containers: KeptAliveContainers, os_name: str, image_base: str, packages: List[str]
+) -> Tuple[str, Dict[str, Optional[str]]]:
+    """Resolve the latest tag and package versions for a single base image.
+
+    Runs in a worker thread, so it only returns plain values; the caller
+    merges them into the manifests.
+    """
+    latest_tag = fetch_latest_tag(os_name, image_base)
+
+    # Fetch all versions in one container run
+    print(f"Fetching package versions for {os_name}:{image_base}...")
+    fetched_versions = fetch_all_package_versions(containers, os_name, image_base, packages)
+    return latest_tag, fetched_versions
 
 def update_manifest(manifest: Dict, package_versions: Dict) -> UpdateResult:
     alias_updates: Dict[Tuple[str, str], str] = {}
     package_updates: Dict[Tuple[str, str, str], str] = {}
 
-    for os_name, versions in manifest.get("targets", {}).items():
-        for version_key, metadata in versions.items():
-            latest_tag = fetch_latest_tag(os_name, metadata["base"])
-            if metadata.get("alias_patch") != latest_tag:
-                metadata["alias_patch"] = latest_tag
-                alias_updates[(os_name, version_key)] = latest_tag
-
-            pkg_data = metadata.get("packages", {})
-            pkg_versions = package_versions.setdefault(os_name, {}).setdefault(version_key, {})
-
-            # Collect all packages for this OS/version
-            all_packages: List[str] = []
-            package_to_bucket: Dict[str, str] = {}
-            for bucket, packages in pkg_data.items():
-                for package in packages:
-                    all_packages.append(package)
-                    package_to_bucket[package] = bucket
-
-            # Fetch all versions in one container run
-            print(f"Fetching package versions for {os_name}:{version_key}...")
-            fetched_versions = fetch_all_package_versions(os_name, metadata["base"], all_packages)
-
-            # Update package versions
-            for package, version_value in fetched_versions.items():
-                if not version_value:
-                    continue
-                bucket = package_to_bucket[package]
+    targets = [
+        (os_name, version_key, metadata)
+        for os_name, versions in manifest.get("targets", {}).items()
+        for version_key, metadata in versions.items()
+    ]
+    if not targets:
+        return UpdateResult(alias_updates, package_updates, False)
+
+    # One work item per (target, bucket), keyed by the (os, base) image its packages are queried in
+    work_items: List[Tuple[str, str, str, List[str], Tuple[str, str]]] = []
+    for os_name, version_key, metadata in targets:
+        image = (os_name, metadata["base"])
+        for bucket, packages in metadata.get("packages", {}).items():
+            work_items.append((os_name, version_key, bucket, packages, image))
+    # Each (image, package) pair is queried once, however many buckets or targets list it
+    image_packages: Dict[Tuple[str, str], Dict[str, None]] = {
+        (os_name, metadata["base"]): {} for os_name, _, metadata in targets
+    }
+    for *_, packages, image in work_items:
+        image_packages[image].update(dict.fromkeys(packages))
+    images = list(image_packages)
+
+    # Pull/build images and start query containers up front, in parallel,
+    # skipping images whose package versions are all cached
+    container_specs = set()
+    for (os_name, base), packages in image_packages.items():
+        if any(cache_get(_package_cache_key(os_name, base, package)) is None for package in packages):
+            container_specs.add((os_name, base, _needs_docker_repo(os_name, packages)))
+    with KeptAliveContainers() as containers:
+        start_containers(containers, sorted(container_specs))
+
+        # Images are independent and I/O bound (Docker Hub + container runs)
+        with ThreadPoolExecutor(max_workers=max(min(len(images), UPDATE_CONCURRENCY), 1)) as executor:
+            results = dict(zip(images, executor.map(
+                lambda image: _process_image(containers, *image, list(image_packages[image])),
+                images,
+            )))
+
+    # Merge on the main thread, in manifest order
+    for os_name, version_key, metadata in targets:
+        latest_tag = results[(os_name, metadata["base"])][0]
+        if metadata.get("alias_patch") != latest_tag:
+            metadata["alias_patch"] = latest_tag
+            alias_updates[(os_name, version_key)] = latest_tag
+
+    # Update package versions bucket by bucket, looking each bucket's dict up once
+    for os_name, version_key, bucket, packages, image in work_items:
+        fetched_versions = results[image][1]
+        pkg_versions = package_versions.setdefault(os_name, {}).setdefault(version_key, {})
+        bucket_versions = pkg_versions.get(bucket)
+        for package in packages:
+            version_value = fetched_versions.get(package)
+            if not version_value:
+                continue
+            if bucket_versions is None:
                 bucket_versions = pkg_versions.setdefault(bucket, {})
-                if bucket_versions.get(package) != version_value:
-                    bucket_versions[package] = version_value
-                    package_updates[(os_name, version_key, package)] = version_value
+            if bucket_versions.get(package) != version_value:
+                bucket_versions[package] = version_value
+                package_updates[(os_name, version_key, package)] = version_value
 
     # Update last_updated timestamp if there were any changes
     has_updates = bool(alias_updates or package_updates)
     if has_updates:
-        manifest.setdefault("metadata", {})["last_updated"] = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+        manifest.setdefault("metadata", {})["last_updated"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
     # Note: Version bumping is handled separately by bump_version.py in the workflow
     return UpdateResult(alias_updates, package_updates, has_updates)
@@ -220,15 +553,19 @@ def main(argv: List[str]) -> int:
 
     manifest = load_json(manifest_path)
     package_versions = load_json(package_versions_path)
+    load_version_cache()
 
     try:
         result = update_manifest(manifest, package_versions)
     except UpdateError as exc:
         print(f"ERROR: {exc}", file=sys.stderr)
         return 1
+    finally:
+        save_version_cache()
 
-    save_json(manifest_path, manifest)
-    save_json(package_versions_path, package_versions)
+    if result.alias_updates or result.package_updates:
+        save_json(manifest_path, manifest)
+        save_json(package_versions_path, package_versions)
 
     if result.alias_updates:
         print("Updated alias patches:")
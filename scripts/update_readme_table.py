@@ -1,17 +1,33 @@
 #!/usr/bin/env python3
 
-import json
 import re
 from pathlib import Path
 
+import _manifest_cache
+
+# Release heading and component table, rewritten together in one pass
+README_PATTERN = re.compile(
+    r"(?P<release>## Current Release: )[\d.]+"
+    r"|(?P<table_heading>### Component Versions\n\n)(?P<table_body>.*?)(?=\n\n>|\n\n##|\Z)",
+    re.DOTALL,
+)
+
+# (row label, package per OS, engine the component ships with or None for all);
+# a package map of None stands for the pinned Docker Compose version
+COMPONENTS_SPEC = [
+    ("Docker Compose", None, None),
+    ("Docker CE", {"ubuntu": "docker-ce", "alpine": "docker"}, "dockerd"),
+    ("Podman", {"ubuntu": "podman", "alpine": "podman"}, "podman"),
+    ("Containerd", {"ubuntu": "containerd.io", "alpine": "containerd"}, "dockerd"),
+    ("OpenSSH", {"ubuntu": "openssh-server", "alpine": "openssh"}, None),
+    ("Supervisor", {"ubuntu": "supervisor", "alpine": "supervisor"}, None),
+]
+
 def load_manifests():
     base_dir = Path(__file__).parent.parent
     
-    with open(base_dir / "manifests/targets.json") as f:
-        targets = json.load(f)
-    
-    with open(base_dir / "manifests/package_versions.json") as f:
-        versions = json.load(f)
+    targets = _manifest_cache.load(str(base_dir / "manifests/targets.json"))
+    versions = _manifest_cache.load(str(base_dir / "manifests/package_versions.json"))
     
     return targets, versions
 
@@ -48,36 +64,26 @@ def generate_table(targets, versions):
                     "display": f"{os_display}<br/>{engine}"
                 })
     
-    header = "| Component |"
-    separator = "|-----------|"
-    for col in columns:
-        header += f" {col['display']} |"
-        separator += ":----------:|"
+    header = "| Component |" + "".join(f" {col['display']} |" for col in columns)
+    separator = "|-----------|" + ":----------:|" * len(columns)
     
-    def get_docker_version(os, ver, eng):
-        if eng != "dockerd":
+    def resolve(packages, engine_filter, col):
+        if packages is None:
+            return compose_version
+        if engine_filter and col["engine"] != engine_filter:
             return "-"
-        pkg = "docker-ce" if os == "ubuntu" else "docker"
-        return get_version(versions, os, ver, pkg, eng)
+        return get_version(versions, col["os"], col["version"], packages[col["os"]], col["engine"])
     
-    components = [
-        ("Docker Compose", lambda os, ver, eng: compose_version),
-        ("Docker CE", get_docker_version),
-        ("Podman", lambda os, ver, eng: get_version(versions, os, ver, "podman", eng) if eng == "podman" else "-"),
-        ("Containerd", lambda os, ver, eng: get_version(versions, os, ver, "containerd.io" if os == "ubuntu" else "containerd", eng) if eng == "dockerd" else "-"),
-        ("OpenSSH", lambda os, ver, eng: get_version(versions, os, ver, "openssh-server" if os == "ubuntu" else "openssh", eng)),
-        ("Supervisor", lambda os, ver, eng: get_version(versions, os, ver, "supervisor", eng)),
+    # Resolve every cell once up front; escape tildes to prevent Markdown strikethrough
+    cells = [
+        [resolve(packages, engine_filter, col).replace("~", "\\~") for col in columns]
+        for _, packages, engine_filter in COMPONENTS_SPEC
     ]
     
-    rows = []
-    for component_name, version_func in components:
-        row = f"| **{component_name}** |"
-        for col in columns:
-            version = version_func(col["os"], col["version"], col["engine"])
-            # Escape tildes to prevent Markdown strikethrough
-            version = version.replace("~", "\\~")
-            row += f" {version} |"
-        rows.append(row)
+    rows = [
+        f"| **{component_name}** |" + "".join(f" {version} |" for version in row)
+        for (component_name, _, _), row in zip(COMPONENTS_SPEC, cells)
+    ]
     
     table = "\n".join([header, separator] + rows)
     
@@ -88,18 +94,18 @@ def update_readme(release_version, table):
     readme_path = base_dir / "README.md"
     
     with open(readme_path, "r") as f:
-        content = f.read()
+        original = f.read()
     
-    content = re.sub(
-        r"## Current Release: [\d.]+",
-        f"## Current Release: {release_version}",
-        content
-    )
+    def replace(match):
+        if match.group("release") is not None:
+            return f"{match.group('release')}{release_version}"
+        return f"{match.group('table_heading')}{table}"
     
-    pattern = r"(### Component Versions\n\n)(.*?)(\n\n>|\n\n##|\Z)"
-    replacement = rf"\1{table}\3"
+    content = README_PATTERN.sub(replace, original)
     
-    content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    if content == original:
+        print(f"✓ README.md already up to date for release {release_version}")
+        return
     
     with open(readme_path, "w") as f:
         f.write(content)